@@ -3,6 +3,9 @@ Crypto Price Alarm - Flask Application
 A real-time cryptocurrency price monitoring and alarm system
 """
 
+import eventlet
+eventlet.monkey_patch()  # Must run before anything imports socket/threading/requests
+
 from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit
 from crypto_monitor import CryptoMonitor
@@ -11,7 +14,7 @@ import os
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
 # Initialize the crypto monitor
 monitor = CryptoMonitor()
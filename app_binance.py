@@ -2,14 +2,37 @@
 Crypto Price Alarm - Using Binance API (Reliable, Real Prices)
 """
 
+import eventlet
+eventlet.monkey_patch()  # Must run before anything imports socket/threading/requests
+
 from flask import Flask, render_template
 from flask_socketio import SocketIO, emit
 from crypto_monitor_binance import CryptoMonitorBinance
-from threading import Thread
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, Socket.IO falls back to the stdlib json
+    orjson = None
+
+
+class OrjsonPackets:
+    """orjson behind the dumps/loads interface Socket.IO uses to encode packets"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'binance-crypto-alarm'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', ping_timeout=60, ping_interval=25)
+# Broadcasts are encoded once and the same frame goes to every recipient,
+# so the encoder speed is what matters per tick
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet', ping_timeout=60, ping_interval=25,
+                    json=OrjsonPackets if orjson else None)
 
 # Initialize the crypto monitor with Binance
 monitor = CryptoMonitorBinance()
@@ -119,16 +142,22 @@ def handle_restart_alarm(data):
         emit('error', {'message': str(e)})
 
 def price_update_callback(update_data):
-    """Callback for price updates"""
-    socketio.emit('price_update', update_data)
-
-def alarm_triggered_callback(alarm_data):
-    """Callback when an alarm is triggered"""
-    socketio.emit('alarm_triggered', alarm_data)
+    """Callback for each monitoring tick"""
+    # Every client shows every asset, so all changed prices go out as one broadcast frame
+    if update_data['delta']:
+        socketio.emit('price', update_data['delta'])
+
+    # Changed alarms and triggered alarms close the tick for everyone. Quiet ticks
+    # are not sent at all.
+    if not (update_data['delta'] or update_data['alarms_changed'] or update_data['triggered']):
+        return
+    socketio.emit('tick', {
+        'alarms_changed': update_data['alarms_changed'],
+        'triggered': update_data['triggered']
+    })
 
 # Set callbacks
 monitor.set_price_update_callback(price_update_callback)
-monitor.set_alarm_callback(alarm_triggered_callback)
 
 # Start monitoring
 monitor.start_monitoring()
@@ -3,16 +3,18 @@ Crypto Price Alarm - DEMO VERSION with Mock Data
 This version uses fake data so you can test the app without API issues
 """
 
+import eventlet
+eventlet.monkey_patch()  # Must run before anything imports socket/threading/requests
+
 from flask import Flask, render_template
 from flask_socketio import SocketIO, emit
 import random
 import time
-from threading import Thread
 from datetime import datetime
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'demo-key'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
 
 # Mock data
 assets = {}
@@ -46,9 +48,6 @@ def handle_add_asset(data):
     pair = data.get('pair', '').strip().upper()
     print(f"📥 Adding mock pair: {pair}")
 
-    # Simulate API delay
-    time.sleep(1)
-
     if pair in assets:
         emit('error', {'message': 'Pair already added'})
         return
@@ -144,10 +143,8 @@ def monitoring_loop():
 
                     asset['lastUpdate'] = time.time()
 
-                # Send updates to clients
-                socketio.emit('price_update', {'assets': assets, 'alarms': alarms})
-
                 # Check alarms (simplified)
+                triggered = []
                 for alarm_id, alarm in list(alarms.items()):
                     if alarm['triggered']:
                         continue
@@ -165,13 +162,28 @@ def monitoring_loop():
                             alarm['triggered'] = True
                             direction = 'up' if current >= target else 'down'
 
-                            socketio.emit('alarm_triggered', {
+                            triggered.append({
                                 'alarm': alarm,
                                 'asset': asset,
                                 'message': f"{asset['name']} reached ${current:.2f} (target: ${target:.2f})",
                                 'direction': direction
                             })
-                            print(f"🚨 ALARM TRIGGERED: {ticker} @ ${current:.2f}")
+                            print(f"🚨 ALARM TRIGGERED: {alarm['ticker']} @ ${current:.2f}")
+
+                # All prices go out as one broadcast frame
+                prices = {
+                    ticker: [asset['price'], asset['change24h'], asset['maxPrice'], asset['minPrice']]
+                    for ticker, asset in assets.items()
+                }
+                if prices:
+                    socketio.emit('price', prices)
+
+                # Changed and triggered alarms close the tick for everyone. The only
+                # alarm change here is a trigger.
+                socketio.emit('tick', {
+                    'alarms_changed': [t['alarm'] for t in triggered],
+                    'triggered': triggered
+                })
 
         except Exception as e:
             print(f"Error in monitoring: {e}")
@@ -193,7 +205,7 @@ if __name__ == '__main__':
     print("Prices update every 5 seconds with random fluctuations")
     print("=" * 70)
 
-    # Start monitoring thread
-    Thread(target=monitoring_loop, daemon=True).start()
+    # Start monitoring as a green thread alongside the socket I/O
+    socketio.start_background_task(monitoring_loop)
 
     socketio.run(app, debug=False, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
@@ -2,13 +2,128 @@
 Crypto Monitor - Core monitoring and alarm logic
 """
 
+import heapq
 import requests
+import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
-import json
 import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from threading import Thread, Lock
-import uuid
+from functools import lru_cache
+from threading import Thread, Lock, Event, Condition
+
+from monitor_utils import dumps, loads, next_alarm_id, timeframe_seconds, write_atomic
+
+# Per-asset price requests run this many at a time when the batched request fails
+FETCH_WORKERS = 8
+
+# Changes are written to disk at most this often (and once more on shutdown)
+SAVE_INTERVAL = 30
+
+# Supported quote currencies, and the ones priced directly in USD
+QUOTE_CURRENCIES = frozenset(['USDT', 'USDC', 'USD', 'BUSD', 'DAI', 'BTC', 'ETH', 'BNB', 'EUR', 'GBP'])
+STABLECOINS = frozenset(['USDT', 'USDC', 'USD', 'BUSD', 'DAI', 'TUSD', 'USDD', 'USDP'])
+
+# Longest first, for suffix matching
+_QUOTES_BY_LENGTH = tuple(sorted(QUOTE_CURRENCIES, key=lambda q: (-len(q), q)))
+
+# BASE + QUOTE. The lazy base leaves the longest quote that fits, so BTCBUSD is BTC/BUSD, not BTCB/USD
+_PAIR_RE = re.compile(r'^(.+?)(' + '|'.join(_QUOTES_BY_LENGTH) + r')$')
+
+
+@lru_cache(maxsize=512)
+def _parse_pair(pair_string):
+    m = _PAIR_RE.match(pair_string)
+    if not m:
+        return None
+    return {'base': m.group(1), 'quote': m.group(2), 'pair': pair_string}
+
+
+# One day of samples at the 15 second polling interval
+HISTORY_SIZE = 24 * 60 * 60 // 15
+
+
+class PriceHistory:
+    """Fixed-size ring buffer of (timestamp, price) samples.
+
+    Indexes are logical: 0 is the oldest sample, -1 the newest. Once full,
+    appending overwrites the oldest sample, so memory per ticker is bounded.
+    """
+    __slots__ = ('ts', 'px', 'start', 'count')
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.ts = array('d', bytes(8 * size))
+        self.px = array('d', bytes(8 * size))
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _pos(self, i):
+        if i < 0:
+            i += self.count
+        return (self.start + i) % len(self.ts)
+
+    def timestamp(self, i):
+        return self.ts[self._pos(i)]
+
+    def price(self, i):
+        return self.px[self._pos(i)]
+
+    def append(self, timestamp, price):
+        size = len(self.ts)
+        pos = (self.start + self.count) % size
+        self.ts[pos] = timestamp
+        self.px[pos] = price
+        if self.count < size:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % size
+
+    def bisect(self, timestamp, right=False):
+        """Index of the first sample after (right) or at/after timestamp"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            t = self.timestamp(mid)
+            if t < timestamp or (right and t == timestamp):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def drop_until(self, timestamp):
+        """Forget samples taken at or before timestamp"""
+        n = self.bisect(timestamp, right=True)
+        self.start = (self.start + n) % len(self.ts)
+        self.count -= n
+
+    def to_json(self):
+        size = len(self.ts)
+        end = self.start + self.count
+        if end <= size:
+            return {'ts': self.ts[self.start:end].tolist(), 'px': self.px[self.start:end].tolist()}
+        return {
+            'ts': self.ts[self.start:].tolist() + self.ts[:end - size].tolist(),
+            'px': self.px[self.start:].tolist() + self.px[:end - size].tolist()
+        }
+
+    @classmethod
+    def from_json(cls, raw):
+        """Build a history from its saved form (also accepts the old list of dicts)"""
+        if isinstance(raw, dict):
+            samples = zip(raw.get('ts', ()), raw.get('px', ()))
+        else:
+            samples = ((h['timestamp'], h['price']) for h in raw)
+
+        history = cls()
+        for timestamp, price in samples:
+            history.append(timestamp, price)
+        return history
 
 
 class CryptoMonitor:
@@ -16,19 +131,44 @@ class CryptoMonitor:
         self.data_file = data_file
         self.assets = {}
         self.alarms = {}
-        self.price_history = {}
+        self.price_history = {}  # ticker -> PriceHistory
+        self.alarms_by_ticker = {}  # ticker -> list of alarm ids watching it
+        self.active_alarm_ids = set()  # Alarms that still need checking (not triggered, or resetting)
+        self._changed_tickers = set()  # Tickers whose alarms need checking on the next tick
+        # ticker -> ids of its rolling (not 'since_start') timeframe alarms. Their window
+        # slides every tick, so those tickers are checked even when the price is flat.
+        self._rolling_tickers = {}
         self.lock = Lock()
         self.monitoring = False
         self.monitor_thread = None
+        self._stop_event = Event()  # Set to end the monitoring loop without waiting out its sleep
+        self.save_thread = None
+        self._dirty = False  # Unsaved changes, flushed by the save thread
+        self._save_event = Event()
+        self._last_save = float('-inf')  # time.monotonic() of the last write
         self.price_update_callback = None
         self.alarm_callback = None
-        self.last_api_call = 0
+        self._last_snapshot_prices = {}  # ticker -> price included in the last price update
+        self._changed_alarm_ids = set()  # Alarms changed by the monitor since the last price update
+        self._mono_last_api = float('-inf')  # time.monotonic() of the latest scheduled API call
+        self._rate_lock = Lock()
         self.min_api_delay = 2.0  # Increased to 2 seconds to avoid rate limits
-        self.reset_timers = {}  # For alarm reset cooldowns
+        # Pending alarm resets as a heap of (time.monotonic() due, alarm_id), run by one timer thread
+        self._timer_heap = []
+        self._timer_cv = Condition()
+        self.timer_thread = None
+
+        # Reused across calls so the pooled connections to CoinGecko are kept alive
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
 
         # Supported quote currencies
-        self.quote_currencies = ['USDT', 'USDC', 'USD', 'BUSD', 'DAI', 'BTC', 'ETH', 'BNB', 'EUR', 'GBP']
-        self.stablecoins = ['USDT', 'USDC', 'USD', 'BUSD', 'DAI', 'TUSD', 'USDD', 'USDP']
+        self.quote_currencies = QUOTE_CURRENCIES
+        self.stablecoins = STABLECOINS
 
         # Load existing data
         self.load_data()
@@ -37,11 +177,18 @@ class CryptoMonitor:
         """Load data from JSON file"""
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.data_file, 'rb') as f:
+                    data = loads(f.read())
                     self.assets = data.get('assets', {})
                     self.alarms = data.get('alarms', {})
-                    self.price_history = data.get('price_history', {})
+                    for alarm in self.alarms.values():
+                        if alarm['type'] == 'timeframe' and '_timeframeSeconds' not in alarm:
+                            alarm['_timeframeSeconds'] = timeframe_seconds(alarm['timeValue'], alarm['timeUnit'])
+                        self._index_alarm(alarm)
+                    self.price_history = {
+                        ticker: PriceHistory.from_json(raw)
+                        for ticker, raw in data.get('price_history', {}).items()
+                    }
                     print(f"Loaded {len(self.assets)} assets and {len(self.alarms)} alarms")
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -51,50 +198,63 @@ class CryptoMonitor:
         try:
             os.makedirs(os.path.dirname(self.data_file) if os.path.dirname(self.data_file) else '.', exist_ok=True)
             with self.lock:
+                self._dirty = False
+                # Snapshot while locked. Asset dicts are replaced on update, so a shallow
+                # copy is enough; alarms and ring buffers change in place and are copied.
                 data = {
-                    'assets': self.assets,
-                    'alarms': self.alarms,
-                    'price_history': self.price_history
+                    'assets': dict(self.assets),
+                    'alarms': {aid: dict(alarm) for aid, alarm in self.alarms.items()},
+                    'price_history': {
+                        ticker: history.to_json() for ticker, history in self.price_history.items()
+                    }
                 }
-                with open(self.data_file, 'w') as f:
-                    json.dump(data, f, indent=2)
+            # Encoding and writing happen outside the lock
+            payload = dumps(data)
+            write_atomic(self.data_file, payload)
+            self._last_save = time.monotonic()
         except Exception as e:
             print(f"Error saving data: {e}")
 
-    def parse_trading_pair(self, pair_string):
-        """Parse a trading pair string into base and quote"""
-        pair_string = pair_string.upper().strip()
+    def _mark_dirty(self):
+        """Schedule a save; the save thread coalesces changes into one write"""
+        self._dirty = True
+        self._save_event.set()
 
-        for quote in self.quote_currencies:
-            if pair_string.endswith(quote) and len(pair_string) > len(quote):
-                base = pair_string[:-len(quote)]
-                return {'base': base, 'quote': quote, 'pair': pair_string}
+    def _save_loop(self):
+        """Flush pending changes to disk, at most once every SAVE_INTERVAL seconds"""
+        while self.monitoring:
+            self._save_event.wait(SAVE_INTERVAL)
+            self._save_event.clear()
+            if self._dirty and time.monotonic() - self._last_save >= SAVE_INTERVAL:
+                self.save_data()
 
-        return None
+    def parse_trading_pair(self, pair_string):
+        """Parse a trading pair string into base and quote"""
+        parsed = _parse_pair(pair_string.upper().strip())
+        return dict(parsed) if parsed else None  # Copy, the cached dict is shared
 
     def is_stablecoin(self, symbol):
         """Check if a symbol is a stablecoin"""
         return symbol.upper() in self.stablecoins
 
-    async def wait_for_rate_limit(self):
-        """Rate limiting for API calls"""
-        now = time.time()
-        time_since_last = now - self.last_api_call
-
-        if time_since_last < self.min_api_delay:
-            wait_time = self.min_api_delay - time_since_last
-            time.sleep(wait_time)
+    def _throttle(self):
+        """Wait for this call's turn under the API rate limit.
 
-        self.last_api_call = time.time()
+        Each caller reserves the next free slot, min_api_delay after the
+        previous one, so concurrent fetches stay spaced out.
+        """
+        with self._rate_lock:
+            slot = max(time.monotonic(), self._mono_last_api + self.min_api_delay)
+            self._mono_last_api = slot
+        time.sleep(max(0, slot - time.monotonic()))
 
     def fetch_coin_id(self, ticker):
         """Fetch CoinGecko coin ID from ticker symbol"""
         try:
-            time.sleep(max(0, self.min_api_delay - (time.time() - self.last_api_call)))
-            self.last_api_call = time.time()
+            self._throttle()
 
             url = f'https://api.coingecko.com/api/v3/search?query={ticker}'
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
 
             if response.status_code == 429:
                 print(f'⚠️  Rate limited by CoinGecko API for ticker: {ticker}')
@@ -119,11 +279,10 @@ class CryptoMonitor:
     def fetch_price(self, coin_id):
         """Fetch price for a single coin"""
         try:
-            time.sleep(max(0, self.min_api_delay - (time.time() - self.last_api_call)))
-            self.last_api_call = time.time()
+            self._throttle()
 
             url = f'https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies=usd&include_24hr_change=true'
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
 
             if response.status_code == 429:
                 print(f'⚠️  Rate limited by CoinGecko API for coin: {coin_id}')
@@ -146,11 +305,10 @@ class CryptoMonitor:
     def fetch_pair_price(self, base_coin_id, quote_coin_id):
         """Fetch price for a trading pair"""
         try:
-            time.sleep(max(0, self.min_api_delay - (time.time() - self.last_api_call)))
-            self.last_api_call = time.time()
+            self._throttle()
 
             url = f'https://api.coingecko.com/api/v3/simple/price?ids={base_coin_id},{quote_coin_id}&vs_currencies=usd&include_24hr_change=true'
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
 
             if response.status_code == 429:
                 print(f'⚠️  Rate limited by CoinGecko API for pair: {base_coin_id}/{quote_coin_id}')
@@ -178,6 +336,41 @@ class CryptoMonitor:
             print(f"Error fetching pair price: {e}")
             return None
 
+    def fetch_prices_bulk(self, coin_ids):
+        """Fetch USD prices for many coins in one request.
+
+        Returns {coin_id: {'usd': ..., 'usd_24h_change': ...}}, {} when rate
+        limited, or None if the request failed.
+        """
+        try:
+            self._throttle()
+
+            url = f"https://api.coingecko.com/api/v3/simple/price?ids={','.join(coin_ids)}&vs_currencies=usd&include_24hr_change=true"
+            response = self.session.get(url, timeout=10)
+
+            if response.status_code == 429:
+                print('⚠️  Rate limited by CoinGecko API while updating prices')
+                return {}
+
+            return response.json()
+        except Exception as e:
+            print(f"Error fetching prices: {e}")
+            return None
+
+    def fetch_prices_per_asset(self, assets):
+        """Fetch prices asset by asset, FETCH_WORKERS requests at a time.
+
+        Takes (ticker, asset) pairs and returns {ticker: price_data}.
+        """
+        def fetch(asset):
+            if self.is_stablecoin(asset['quote']):
+                return self.fetch_price(asset['baseCoinId'])
+            return self.fetch_pair_price(asset['baseCoinId'], asset['quoteCoinId'])
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            results = executor.map(fetch, [asset for ticker, asset in assets])
+            return {ticker: price_data for (ticker, asset), price_data in zip(assets, results) if price_data}
+
     def add_asset(self, pair_string):
         """Add a new trading pair to monitor"""
         parsed = self.parse_trading_pair(pair_string)
@@ -216,6 +409,7 @@ class CryptoMonitor:
             return {'success': False, 'message': 'Could not fetch price data. API may be rate limited. Wait 1-2 minutes and try again.'}
 
         # Create asset
+        now = time.time()
         asset = {
             'ticker': pair,
             'base': base,
@@ -228,13 +422,14 @@ class CryptoMonitor:
             'change24h': price_data['change24h'],
             'maxPrice': price_data['price'],
             'minPrice': price_data['price'],
-            'lastUpdate': time.time()
+            'lastUpdate': now
         }
 
         with self.lock:
             self.assets[pair] = asset
-            self.price_history[pair] = [{'price': price_data['price'], 'timestamp': time.time()}]
-            self.save_data()
+            self.price_history[pair] = PriceHistory()
+            self.price_history[pair].append(now, price_data['price'])
+            self._mark_dirty()
 
         return {'success': True, 'asset': asset}
 
@@ -248,15 +443,16 @@ class CryptoMonitor:
                 del self.price_history[ticker]
 
             # Remove associated alarms
-            alarms_to_remove = [aid for aid, alarm in self.alarms.items() if alarm['ticker'] == ticker]
-            for aid in alarms_to_remove:
-                del self.alarms[aid]
+            for aid in self.alarms_by_ticker.pop(ticker, []):
+                self.alarms.pop(aid, None)
+                self.active_alarm_ids.discard(aid)
+            self._rolling_tickers.pop(ticker, None)
 
-            self.save_data()
+            self._mark_dirty()
 
     def add_target_alarm(self, ticker, target_price, direction):
         """Add a target price alarm"""
-        alarm_id = str(uuid.uuid4())
+        alarm_id = next_alarm_id()
         alarm = {
             'id': alarm_id,
             'ticker': ticker,
@@ -269,13 +465,14 @@ class CryptoMonitor:
 
         with self.lock:
             self.alarms[alarm_id] = alarm
-            self.save_data()
+            self._index_alarm(alarm)
+            self._mark_dirty()
 
         return alarm
 
     def add_extreme_alarm(self, ticker, percentage, extreme_type):
         """Add a max/min percentage alarm"""
-        alarm_id = str(uuid.uuid4())
+        alarm_id = next_alarm_id()
         alarm = {
             'id': alarm_id,
             'ticker': ticker,
@@ -288,13 +485,15 @@ class CryptoMonitor:
 
         with self.lock:
             self.alarms[alarm_id] = alarm
-            self.save_data()
+            self._index_alarm(alarm)
+            self._mark_dirty()
 
         return alarm
 
     def add_timeframe_alarm(self, ticker, percentage, direction, time_value, time_unit):
         """Add a timeframe percentage alarm"""
-        alarm_id = str(uuid.uuid4())
+        alarm_id = next_alarm_id()
+        now = time.time()
         alarm = {
             'id': alarm_id,
             'ticker': ticker,
@@ -303,14 +502,16 @@ class CryptoMonitor:
             'direction': direction,
             'timeValue': int(time_value) if time_unit != 'since_start' else None,
             'timeUnit': time_unit,
+            '_timeframeSeconds': timeframe_seconds(time_value, time_unit),
             'triggered': False,
-            'createdAt': time.time(),
-            'lastResetTime': time.time()
+            'createdAt': now,
+            'lastResetTime': now
         }
 
         with self.lock:
             self.alarms[alarm_id] = alarm
-            self.save_data()
+            self._index_alarm(alarm)
+            self._mark_dirty()
 
         return alarm
 
@@ -318,129 +519,237 @@ class CryptoMonitor:
         """Remove an alarm"""
         with self.lock:
             if alarm_id in self.alarms:
-                del self.alarms[alarm_id]
-                self.save_data()
+                self._unindex_alarm(self.alarms.pop(alarm_id))
+                self._mark_dirty()
+
+    def _index_alarm(self, alarm):
+        """Register an alarm under its ticker so checks run per ticker"""
+        self.alarms_by_ticker.setdefault(alarm['ticker'], []).append(alarm['id'])
+        if alarm['type'] == 'timeframe' and alarm['timeUnit'] != 'since_start':
+            self._rolling_tickers.setdefault(alarm['ticker'], set()).add(alarm['id'])
+        if not alarm.get('triggered') or alarm.get('resetting'):
+            self.active_alarm_ids.add(alarm['id'])
+            self._changed_tickers.add(alarm['ticker'])  # New alarms get checked right away
+
+    def _unindex_alarm(self, alarm):
+        """Drop an alarm from the per-ticker index"""
+        self.active_alarm_ids.discard(alarm['id'])
+        alarm_ids = self.alarms_by_ticker.get(alarm['ticker'])
+        if alarm_ids and alarm['id'] in alarm_ids:
+            alarm_ids.remove(alarm['id'])
+        rolling_ids = self._rolling_tickers.get(alarm['ticker'])
+        if rolling_ids:
+            rolling_ids.discard(alarm['id'])
+            if not rolling_ids:
+                del self._rolling_tickers[alarm['ticker']]
 
     def restart_alarm(self, alarm_id):
         """Restart a target alarm after 60 seconds"""
+        with self.lock:
+            if alarm_id not in self.alarms:
+                return
+            alarm = self.alarms[alarm_id]
+            alarm['resetUntil'] = time.time() + 60
+            alarm['resetting'] = True
+            self.active_alarm_ids.add(alarm_id)
+            self._changed_tickers.add(alarm['ticker'])
+            self._mark_dirty()
+
+        # Schedule the reset on the timer thread
+        with self._timer_cv:
+            heapq.heappush(self._timer_heap, (time.monotonic() + 60, alarm_id))
+            self._timer_cv.notify()
+
+    def _reset_alarm(self, alarm_id):
+        """End an alarm's restart cooldown so it can trigger again"""
         with self.lock:
             if alarm_id in self.alarms:
-                alarm = self.alarms[alarm_id]
-                alarm['resetUntil'] = time.time() + 60
-                alarm['resetting'] = True
-                self.save_data()
-
-                # Start a timer to reset it
-                def reset_after_cooldown():
-                    time.sleep(60)
-                    with self.lock:
-                        if alarm_id in self.alarms:
-                            self.alarms[alarm_id]['triggered'] = False
-                            self.alarms[alarm_id]['resetting'] = False
-                            self.alarms[alarm_id]['resetUntil'] = None
-                            self.save_data()
-
-                Thread(target=reset_after_cooldown, daemon=True).start()
-
-    def update_all_prices(self):
-        """Update prices for all assets"""
-        for ticker, asset in list(self.assets.items()):
-            try:
-                price_data = None
+                self.alarms[alarm_id]['triggered'] = False
+                self.alarms[alarm_id]['resetting'] = False
+                self.alarms[alarm_id]['resetUntil'] = None
+                self._changed_alarm_ids.add(alarm_id)
+                self._changed_tickers.add(self.alarms[alarm_id]['ticker'])
+                self._mark_dirty()
+
+    def _timer_loop(self):
+        """Run scheduled alarm resets when they come due"""
+        while self.monitoring:
+            due = []
+            with self._timer_cv:
+                now = time.monotonic()
+                while self._timer_heap and self._timer_heap[0][0] <= now:
+                    due.append(heapq.heappop(self._timer_heap)[1])
+                if not due:
+                    timeout = self._timer_heap[0][0] - now if self._timer_heap else None
+                    self._timer_cv.wait(timeout)
+
+            for alarm_id in due:
+                self._reset_alarm(alarm_id)
+
+    def update_all_prices(self, now=None):
+        """Update prices for all assets, with one batched API call when possible"""
+        assets = list(self.assets.items())
+        if not assets:
+            return
+
+        coin_ids = set()
+        for ticker, asset in assets:
+            coin_ids.add(asset['baseCoinId'])
+            if asset.get('quoteCoinId'):
+                coin_ids.add(asset['quoteCoinId'])
+
+        prices = self.fetch_prices_bulk(sorted(coin_ids))
+        if prices is None:
+            # The batched request failed, fall back to one request per asset
+            pair_prices = self.fetch_prices_per_asset(assets)
+        else:
+            pair_prices = {}
+            for ticker, asset in assets:
+                base = prices.get(asset['baseCoinId'])
+                if not base:
+                    continue
 
                 if self.is_stablecoin(asset['quote']):
-                    price_data = self.fetch_price(asset['baseCoinId'])
+                    pair_prices[ticker] = {
+                        'price': base['usd'],
+                        'change24h': base.get('usd_24h_change', 0)
+                    }
                 else:
-                    price_data = self.fetch_pair_price(asset['baseCoinId'], asset['quoteCoinId'])
-
-                if price_data:
-                    with self.lock:
-                        asset['price'] = price_data['price']
-                        asset['change24h'] = price_data['change24h']
-                        asset['lastUpdate'] = time.time()
-
-                        # Update max/min
-                        if price_data['price'] > asset['maxPrice']:
-                            asset['maxPrice'] = price_data['price']
-                        if price_data['price'] < asset['minPrice']:
-                            asset['minPrice'] = price_data['price']
-
-                        # Update price history
-                        if ticker not in self.price_history:
-                            self.price_history[ticker] = []
-
-                        self.price_history[ticker].append({
-                            'price': price_data['price'],
-                            'timestamp': time.time()
-                        })
+                    quote = prices.get(asset['quoteCoinId'])
+                    if not quote or not quote['usd']:
+                        continue
+                    pair_prices[ticker] = {
+                        'price': base['usd'] / quote['usd'],
+                        'change24h': base.get('usd_24h_change', 0) - quote.get('usd_24h_change', 0)
+                    }
+
+        # Build the updated assets outside the lock, then only swap them in while holding it
+        if now is None:
+            now = time.time()
+        updates = []
+        for ticker, asset in assets:
+            try:
+                price_data = pair_prices.get(ticker)
+                if not price_data:
+                    continue
+
+                price = price_data['price']
+                change = price_data['change24h']
 
-                        # Keep only last 24 hours
-                        cutoff = time.time() - (24 * 60 * 60)
-                        self.price_history[ticker] = [
-                            h for h in self.price_history[ticker] if h['timestamp'] > cutoff
-                        ]
+                updated = dict(asset)
+                updated['price'] = price
+                updated['change24h'] = change
+                updated['lastUpdate'] = now
 
-                        self.assets[ticker] = asset
+                # Update max/min
+                if price > updated['maxPrice']:
+                    updated['maxPrice'] = price
+                if price < updated['minPrice']:
+                    updated['minPrice'] = price
+
+                updates.append(updated)
 
             except Exception as e:
                 print(f"Error updating price for {ticker}: {e}")
 
-        self.save_data()
-
-    def check_alarms(self):
-        """Check all alarms for trigger conditions"""
+        with self.lock:
+            for updated in updates:
+                ticker = updated['ticker']
+                if ticker not in self.assets:  # Removed while fetching
+                    continue
+                if self.assets[ticker]['price'] != updated['price']:
+                    self._changed_tickers.add(ticker)
+                self.assets[ticker] = updated
+
+                # Update price history in place, keeping only the last 24 hours
+                if ticker not in self.price_history:
+                    self.price_history[ticker] = PriceHistory()
+                history = self.price_history[ticker]
+                history.drop_until(now - (24 * 60 * 60))
+                history.append(now, updated['price'])
+
+        self._mark_dirty()
+
+    def check_alarms(self, tickers=None, now=None):
+        """Check alarms for trigger conditions.
+
+        Only alarms on the given tickers are checked; by default those whose
+        price changed (or that got new or reset alarms) since the last check,
+        plus those with active rolling timeframe alarms.
+        """
         triggered_alarms = []
+        updates = []  # (alarm_id, changed fields), applied together at the end
+        if now is None:
+            now = time.time()
+        # Timeframe window start indices, shared by alarms watching the same window
+        window_cache = {}
 
-        for alarm_id, alarm in list(self.alarms.items()):
-            if alarm.get('triggered') and not alarm.get('resetting'):
+        if tickers is None:
+            with self.lock:
+                tickers, self._changed_tickers = self._changed_tickers, set()
+                for ticker, rolling_ids in self._rolling_tickers.items():
+                    if not rolling_ids.isdisjoint(self.active_alarm_ids):
+                        tickers.add(ticker)
+
+        for ticker in tickers:
+            asset = self.assets.get(ticker)
+            if asset is None:
                 continue
 
-            ticker = alarm['ticker']
-            if ticker not in self.assets:
-                continue
+            # Triggered alarms are not in active_alarm_ids, so they are never looked at
+            for alarm_id in [aid for aid in self.alarms_by_ticker.get(ticker, ()) if aid in self.active_alarm_ids]:
+                alarm = self.alarms.get(alarm_id)
+                if alarm is None:
+                    continue
 
-            asset = self.assets[ticker]
-            should_trigger = False
-            message = ''
-            direction = None
+                should_trigger = False
+                message = ''
+                direction = None
 
-            try:
-                if alarm['type'] == 'target':
-                    should_trigger, direction = self.check_target_alarm(alarm, asset)
-                    if should_trigger:
-                        message = f"{asset['name']} ({ticker}) reached target price!"
+                try:
+                    if alarm['type'] == 'target':
+                        should_trigger, direction = self.check_target_alarm(alarm, asset)
+                        if should_trigger:
+                            message = f"{asset['name']} ({ticker}) reached target price!"
 
-                elif alarm['type'] == 'extreme':
-                    should_trigger, direction = self.check_extreme_alarm(alarm, asset)
-                    if should_trigger:
-                        message = f"{asset['name']} ({ticker}) hit extreme price level!"
+                    elif alarm['type'] == 'extreme':
+                        should_trigger, direction = self.check_extreme_alarm(alarm, asset)
+                        if should_trigger:
+                            message = f"{asset['name']} ({ticker}) hit extreme price level!"
+
+                    elif alarm['type'] == 'timeframe':
+                        should_trigger, direction = self.check_timeframe_alarm(alarm, asset, now, window_cache)
+                        if should_trigger:
+                            message = f"{asset['name']} ({ticker}) hit timeframe target!"
 
-                elif alarm['type'] == 'timeframe':
-                    should_trigger, direction = self.check_timeframe_alarm(alarm, asset)
                     if should_trigger:
-                        message = f"{asset['name']} ({ticker}) hit timeframe target!"
-
-                if should_trigger:
-                    # Handle "since_start" alarms differently
-                    if alarm['type'] == 'timeframe' and alarm['timeUnit'] == 'since_start':
-                        with self.lock:
-                            self.alarms[alarm_id]['lastResetTime'] = time.time()
-                            self.save_data()
-                    else:
-                        with self.lock:
-                            self.alarms[alarm_id]['triggered'] = True
-                            self.alarms[alarm_id]['triggeredAt'] = time.time()
-                            self.save_data()
-
-                    triggered_alarms.append({
-                        'alarm': alarm,
-                        'asset': asset,
-                        'message': message,
-                        'direction': direction
-                    })
+                        # Handle "since_start" alarms differently
+                        if alarm['type'] == 'timeframe' and alarm['timeUnit'] == 'since_start':
+                            updates.append((alarm_id, {'lastResetTime': now}))
+                        else:
+                            updates.append((alarm_id, {'triggered': True, 'triggeredAt': now}))
+
+                        triggered_alarms.append({
+                            'alarm': alarm,
+                            'asset': asset,
+                            'message': message,
+                            'direction': direction
+                        })
 
-            except Exception as e:
-                print(f"Error checking alarm {alarm_id}: {e}")
+                except Exception as e:
+                    print(f"Error checking alarm {alarm_id}: {e}")
+
+        if updates:
+            with self.lock:
+                for alarm_id, changes in updates:
+                    alarm = self.alarms.get(alarm_id)
+                    if alarm is None:
+                        continue
+                    alarm.update(changes)
+                    if alarm.get('triggered') and not alarm.get('resetting'):
+                        self.active_alarm_ids.discard(alarm_id)
+                    self._changed_alarm_ids.add(alarm_id)
+            self._mark_dirty()
 
         return triggered_alarms
 
@@ -451,9 +760,9 @@ class CryptoMonitor:
         eps = max(1e-8, abs(target_price) * 1e-6)
 
         ticker = alarm['ticker']
-        history = self.price_history.get(ticker, [])
+        history = self.price_history.get(ticker)
 
-        if len(history) < 2:
+        if not history or len(history) < 2:
             if alarm['direction'] == 'up':
                 return current_price + eps >= target_price, 'up'
             elif alarm['direction'] == 'down':
@@ -461,7 +770,7 @@ class CryptoMonitor:
             else:
                 return abs(current_price - target_price) <= eps, None
 
-        previous_price = history[-2]['price']
+        previous_price = history.price(-2)
 
         if alarm['direction'] == 'up':
             if previous_price < target_price and current_price + eps >= target_price:
@@ -493,39 +802,35 @@ class CryptoMonitor:
 
         return False, None
 
-    def check_timeframe_alarm(self, alarm, asset):
+    def check_timeframe_alarm(self, alarm, asset, now=None, window_cache=None):
         """Check if timeframe alarm should trigger"""
         ticker = alarm['ticker']
-        history = self.price_history.get(ticker, [])
+        history = self.price_history.get(ticker)
 
-        if len(history) < 2:
+        if not history or len(history) < 2:
             return False, None
 
-        current_time = time.time()
+        current_time = now if now is not None else time.time()
 
-        if alarm['timeUnit'] == 'since_start':
+        timeframe_seconds = alarm.get('_timeframeSeconds')
+        if timeframe_seconds is None:
             start_time = alarm.get('lastResetTime', alarm['createdAt'])
         else:
-            # Calculate timeframe in seconds
-            time_value = alarm['timeValue']
-            if alarm['timeUnit'] == 'minutes':
-                timeframe_seconds = time_value * 60
-            elif alarm['timeUnit'] == 'hours':
-                timeframe_seconds = time_value * 60 * 60
-            elif alarm['timeUnit'] == 'days':
-                timeframe_seconds = time_value * 24 * 60 * 60
-            else:
-                timeframe_seconds = time_value * 60
-
             start_time = current_time - timeframe_seconds
 
-        # Find relevant history
-        relevant_history = [h for h in history if h['timestamp'] >= start_time]
+        # History is sorted by timestamp, so the window start is a binary search
+        key = (ticker, start_time)
+        if window_cache is not None and key in window_cache:
+            idx = window_cache[key]
+        else:
+            idx = history.bisect(start_time)
+            if window_cache is not None:
+                window_cache[key] = idx
 
-        if not relevant_history:
+        if idx >= len(history):
             return False, None
 
-        start_price = relevant_history[0]['price']
+        start_price = history.price(idx)
         current_price = asset['price']
         percent_change = ((current_price - start_price) / start_price) * 100
 
@@ -544,19 +849,24 @@ class CryptoMonitor:
     def monitoring_loop(self):
         """Main monitoring loop"""
         print("Monitoring started")
-        while self.monitoring:
+        while True:
             try:
+                # One timestamp for the whole tick
+                now = time.time()
+
                 # Update prices
-                self.update_all_prices()
+                self.update_all_prices(now)
 
                 # Check alarms
-                triggered = self.check_alarms()
+                triggered = self.check_alarms(now=now)
 
-                # Notify via callback
-                if self.price_update_callback:
+                # Notify via callback, only with what changed this tick
+                delta = self.get_price_delta()
+                alarms_changed = self.get_changed_alarms()
+                if self.price_update_callback and (delta or alarms_changed):
                     self.price_update_callback({
-                        'assets': self.get_assets(),
-                        'alarms': self.get_alarms()
+                        'delta': delta,
+                        'alarms_changed': alarms_changed
                     })
 
                 if triggered and self.alarm_callback:
@@ -566,8 +876,9 @@ class CryptoMonitor:
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")
 
-            # Wait 15 seconds before next update
-            time.sleep(15)
+            # Wait 15 seconds before next update, or stop right away
+            if self._stop_event.wait(15):
+                break
 
         print("Monitoring stopped")
 
@@ -575,14 +886,27 @@ class CryptoMonitor:
         """Start the monitoring thread"""
         if not self.monitoring:
             self.monitoring = True
+            self._stop_event.clear()
             self.monitor_thread = Thread(target=self.monitoring_loop, daemon=True)
             self.monitor_thread.start()
+            self.save_thread = Thread(target=self._save_loop, daemon=True)
+            self.save_thread.start()
+            self.timer_thread = Thread(target=self._timer_loop, daemon=True)
+            self.timer_thread.start()
 
     def stop_monitoring(self):
         """Stop the monitoring thread"""
         self.monitoring = False
+        self._stop_event.set()
+        self._save_event.set()
+        with self._timer_cv:
+            self._timer_cv.notify()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        if self.save_thread:
+            self.save_thread.join(timeout=5)
+        if self._dirty:
+            self.save_data()
 
     def set_price_update_callback(self, callback):
         """Set callback for price updates"""
@@ -601,3 +925,20 @@ class CryptoMonitor:
         """Get all alarms"""
         with self.lock:
             return dict(self.alarms)
+
+    def get_price_delta(self):
+        """Assets whose price changed since the last call, as {ticker: asset}"""
+        with self.lock:
+            delta = {
+                ticker: asset for ticker, asset in self.assets.items()
+                if self._last_snapshot_prices.get(ticker) != asset['price']
+            }
+            self._last_snapshot_prices = {ticker: asset['price'] for ticker, asset in self.assets.items()}
+        return delta
+
+    def get_changed_alarms(self):
+        """Alarms the monitor changed (triggered, reset) since the last call"""
+        with self.lock:
+            changed = [self.alarms[aid] for aid in self._changed_alarm_ids if aid in self.alarms]
+            self._changed_alarm_ids.clear()
+        return changed
@@ -3,13 +3,77 @@ Crypto Monitor - Using Binance API (More Reliable)
 Binance has better rate limits than CoinGecko
 """
 
+import bisect
 import requests
+import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import json
 import os
+from array import array
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from threading import Thread, RLock
-import uuid
+from threading import Thread, Lock
+import itertools
+
+from monitor_utils import dumps, loads, next_alarm_id, timeframe_seconds, write_atomic
+
+try:
+    import websocket
+except ImportError:  # websocket-client is optional, prices are then polled over REST
+    websocket = None
+
+BINANCE_STREAM_URL = 'wss://stream.binance.com:9443/ws'
+
+# Streamed prices arrive about once a second. The history keeps one sample per
+# this many seconds (the old polling interval) and updates the newest in between.
+STREAM_SAMPLE_SECONDS = 10
+
+# Changes are written to disk at most this often (and once more on shutdown)
+SAVE_INTERVAL = 30
+
+# Common quote currencies, longest first. The match needs at least one base
+# character in front of it, and search() returns the leftmost (i.e. longest) suffix.
+_QUOTE_RE = re.compile(r'(?<=.)(USDT|USDC|BUSD|BNB|ETH|BTC|EUR|GBP)$')
+
+@dataclass
+class Asset:
+    """A monitored trading pair. Field names match the JSON sent to clients."""
+    __slots__ = ('ticker', 'base', 'quote', 'name', 'price', 'change24h', 'maxPrice', 'minPrice',
+                 'high24h', 'low24h', 'lastUpdate')
+
+    ticker: str
+    base: str
+    quote: str
+    name: str
+    price: float
+    change24h: float
+    maxPrice: float
+    minPrice: float
+    high24h: float
+    low24h: float
+    lastUpdate: float
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def _new_history(timestamps=(), prices=()):
+    """Price history as parallel float arrays: timestamps ('ts') and prices ('px')"""
+    return {'ts': array('d', timestamps), 'px': array('d', prices)}
+
+
+def _history_from_json(raw):
+    """Build a history from its saved form (also accepts the old list of dicts)"""
+    if isinstance(raw, dict):
+        return _new_history(raw.get('ts', ()), raw.get('px', ()))
+    return _new_history([h['timestamp'] for h in raw], [h['price'] for h in raw])
 
 
 class CryptoMonitorBinance:
@@ -17,14 +81,44 @@ class CryptoMonitorBinance:
         self.data_file = data_file
         self.assets = {}
         self.alarms = {}
-        self.price_history = {}
-        self.lock = RLock()
+        self.price_history = {}  # ticker -> {'ts': array, 'px': array}, sorted by timestamp
+        self.alarms_by_ticker = {}  # ticker -> list of alarm ids watching it
+        self.targets_by_ticker = {}  # ticker -> {'prices': sorted targets, 'ids': matching alarm ids}
+        self.active_alarm_ids = set()  # Alarms that still need checking (not triggered, or resetting)
+        # Separate locks so price updates don't block alarm edits (and vice versa).
+        # When more than one is needed, take them in this order.
+        self._assets_lock = Lock()
+        self._alarms_lock = Lock()
+        self._history_lock = Lock()
         self.monitoring = False
         self.monitor_thread = None
+        self.save_thread = None
+        self._dirty = False  # Unsaved changes, flushed by the save thread
+        self._last_save = float('-inf')  # time.monotonic() of the last write
         self.price_update_callback = None
-        self.alarm_callback = None
+        self._last_sent_prices = {}  # ticker -> price included in the last tick message
+        self._changed_alarm_ids = set()  # Alarms changed by the monitor since the last tick message
+        # ticker -> price seen by the previous alarm check. Target crossings are measured
+        # from it, since a streamed price can update the newest history sample many times.
+        self._checked_prices = {}
         self.reset_timers = {}
 
+        # Prices are pushed by the Binance ticker stream, REST polling is the fallback
+        self.stream = None
+        self.stream_thread = None
+        self._stream_connected = False
+        self._stream_request_ids = itertools.count(1)
+        self._pending_triggered = deque()  # Alarms triggered by streamed prices, sent with the next tick
+
+        # Reused across ticks so the TCP/TLS connection to Binance stays alive
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=2, backoff_factor=0.3)
+        ))
+        self.session.headers['Accept-Encoding'] = 'gzip'
+
         # Load existing data
         self.load_data()
 
@@ -32,11 +126,21 @@ class CryptoMonitorBinance:
         """Load data from JSON file"""
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.assets = data.get('assets', {})
+                with open(self.data_file, 'rb') as f:
+                    data = loads(f.read())
+                    self.assets = {
+                        ticker: Asset.from_dict(asset)
+                        for ticker, asset in data.get('assets', {}).items()
+                    }
                     self.alarms = data.get('alarms', {})
-                    self.price_history = data.get('price_history', {})
+                    for alarm in self.alarms.values():
+                        if alarm['type'] == 'timeframe' and '_timeframeSeconds' not in alarm:
+                            alarm['_timeframeSeconds'] = timeframe_seconds(alarm['timeValue'], alarm['timeUnit'])
+                        self._index_alarm(alarm)
+                    self.price_history = {
+                        ticker: _history_from_json(history)
+                        for ticker, history in data.get('price_history', {}).items()
+                    }
                     print(f"Loaded {len(self.assets)} assets and {len(self.alarms)} alarms")
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -45,24 +149,43 @@ class CryptoMonitorBinance:
         """Save data to JSON file"""
         try:
             os.makedirs(os.path.dirname(self.data_file) if os.path.dirname(self.data_file) else '.', exist_ok=True)
-            with self.lock:
+
+            # Only the snapshot needs the lock; encoding and disk I/O happen outside it
+            with self._assets_lock, self._alarms_lock, self._history_lock:
+                self._dirty = False
                 data = {
-                    'assets': self.assets,
-                    'alarms': self.alarms,
-                    'price_history': self.price_history
+                    'assets': {ticker: asset.to_dict() for ticker, asset in self.assets.items()},
+                    'alarms': {alarm_id: dict(alarm) for alarm_id, alarm in self.alarms.items()},
+                    'price_history': {
+                        ticker: {'ts': history['ts'].tolist(), 'px': history['px'].tolist()}
+                        for ticker, history in self.price_history.items()
+                    }
                 }
-                with open(self.data_file, 'w') as f:
-                    json.dump(data, f, indent=2)
+
+            payload = dumps(data)
+            write_atomic(self.data_file, payload)
+            self._last_save = time.monotonic()
         except Exception as e:
             print(f"Error saving data: {e}")
 
+    def _mark_dirty(self):
+        """Schedule a save; the save thread coalesces changes into one write"""
+        self._dirty = True
+
+    def _save_loop(self):
+        """Flush pending changes to disk, at most once every SAVE_INTERVAL seconds"""
+        while self.monitoring:
+            time.sleep(1)
+            if self._dirty and time.monotonic() - self._last_save >= SAVE_INTERVAL:
+                self.save_data()
+
     def fetch_binance_price(self, symbol):
         """Fetch price from Binance API"""
         try:
             # Binance uses symbols like BTCUSDT (no separator)
             url = f'https://api.binance.com/api/v3/ticker/24hr?symbol={symbol}'
             print(f"  Calling Binance API: {url}")
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
 
             print(f"  Status code: {response.status_code}")
 
@@ -88,6 +211,33 @@ class CryptoMonitorBinance:
             traceback.print_exc()
             return None
 
+    def fetch_binance_prices_bulk(self, symbols):
+        """Fetch 24h tickers for many symbols with a single Binance API call"""
+        try:
+            # One request for all symbols instead of one round trip per symbol
+            params = {'symbols': json.dumps(list(symbols), separators=(',', ':'))}
+            response = self.session.get('https://api.binance.com/api/v3/ticker/24hr', params=params, timeout=10)
+
+            if response.status_code != 200:
+                print(f"❌ Binance bulk API error: {response.status_code}")
+                print(f"  Response: {response.text[:200]}")
+                return None
+
+            return {
+                data['symbol']: {
+                    'price': float(data['lastPrice']),
+                    'change24h': float(data['priceChangePercent']),
+                    'high24h': float(data['highPrice']),
+                    'low24h': float(data['lowPrice']),
+                    'volume': float(data['volume'])
+                }
+                for data in response.json()
+            }
+
+        except Exception as e:
+            print(f"❌ Exception fetching Binance prices: {e}")
+            return None
+
     def add_asset(self, pair):
         """Add a new trading pair to monitor"""
         try:
@@ -114,16 +264,13 @@ class CryptoMonitorBinance:
 
             # Parse the pair to get base and quote
             print(f"  Step 3: Parsing pair...")
-            # Common quote currencies
-            quotes = ['USDT', 'USDC', 'BUSD', 'BTC', 'ETH', 'BNB', 'EUR', 'GBP']
             base = None
             quote = None
 
-            for q in quotes:
-                if pair.endswith(q) and len(pair) > len(q):
-                    base = pair[:-len(q)]
-                    quote = q
-                    break
+            m = _QUOTE_RE.search(pair)
+            if m:
+                quote = m.group(1)
+                base = pair[:-len(quote)]
 
             print(f"  Step 4: Parsed - base={base}, quote={quote}")
 
@@ -131,29 +278,31 @@ class CryptoMonitorBinance:
                 return {'success': False, 'message': 'Could not parse trading pair'}
 
             # Create asset
-            print(f"  Step 5: Creating asset dict...")
-            asset = {
-                'ticker': pair,
-                'base': base,
-                'quote': quote,
-                'name': f"{base}/{quote}",
-                'price': price_data['price'],
-                'change24h': price_data['change24h'],
-                'maxPrice': price_data['price'],
-                'minPrice': price_data['price'],
-                'high24h': price_data['high24h'],
-                'low24h': price_data['low24h'],
-                'lastUpdate': time.time()
-            }
+            print(f"  Step 5: Creating asset...")
+            asset = Asset(
+                ticker=pair,
+                base=base,
+                quote=quote,
+                name=f"{base}/{quote}",
+                price=price_data['price'],
+                change24h=price_data['change24h'],
+                maxPrice=price_data['price'],
+                minPrice=price_data['price'],
+                high24h=price_data['high24h'],
+                low24h=price_data['low24h'],
+                lastUpdate=time.time()
+            )
 
             print(f"  Step 6: Saving to storage...")
-            with self.lock:
+            with self._assets_lock:
                 self.assets[pair] = asset
-                self.price_history[pair] = [{'price': price_data['price'], 'timestamp': time.time()}]
-                self.save_data()
+            with self._history_lock:
+                self.price_history[pair] = _new_history([time.time()], [price_data['price']])
+            self._mark_dirty()
+            self._stream_send('SUBSCRIBE', [pair])
 
             print(f"✅ Successfully added {pair}: ${price_data['price']}")
-            return {'success': True, 'asset': asset}
+            return {'success': True, 'asset': asset.to_dict()}
 
         except Exception as e:
             print(f"  ❌ Exception in add_asset: {e}")
@@ -163,23 +312,26 @@ class CryptoMonitorBinance:
 
     def remove_asset(self, ticker):
         """Remove a trading pair"""
-        with self.lock:
-            if ticker in self.assets:
-                del self.assets[ticker]
+        with self._assets_lock:
+            self.assets.pop(ticker, None)
 
-            if ticker in self.price_history:
-                del self.price_history[ticker]
+        # Remove associated alarms
+        with self._alarms_lock:
+            for aid in self.alarms_by_ticker.pop(ticker, []):
+                self.alarms.pop(aid, None)
+                self.active_alarm_ids.discard(aid)
+            self.targets_by_ticker.pop(ticker, None)
+            self._checked_prices.pop(ticker, None)
 
-            # Remove associated alarms
-            alarms_to_remove = [aid for aid, alarm in self.alarms.items() if alarm['ticker'] == ticker]
-            for aid in alarms_to_remove:
-                del self.alarms[aid]
+        with self._history_lock:
+            self.price_history.pop(ticker, None)
 
-            self.save_data()
+        self._mark_dirty()
+        self._stream_send('UNSUBSCRIBE', [ticker])
 
     def add_target_alarm(self, ticker, target_price, direction):
         """Add a target price alarm"""
-        alarm_id = str(uuid.uuid4())
+        alarm_id = next_alarm_id()
         alarm = {
             'id': alarm_id,
             'ticker': ticker,
@@ -190,15 +342,16 @@ class CryptoMonitorBinance:
             'createdAt': time.time()
         }
 
-        with self.lock:
+        with self._alarms_lock:
             self.alarms[alarm_id] = alarm
-            self.save_data()
+            self._index_alarm(alarm)
+        self._mark_dirty()
 
         return alarm
 
     def add_extreme_alarm(self, ticker, percentage, extreme_type):
         """Add a max/min percentage alarm"""
-        alarm_id = str(uuid.uuid4())
+        alarm_id = next_alarm_id()
         alarm = {
             'id': alarm_id,
             'ticker': ticker,
@@ -209,20 +362,21 @@ class CryptoMonitorBinance:
             'createdAt': time.time()
         }
 
-        with self.lock:
+        with self._alarms_lock:
             self.alarms[alarm_id] = alarm
-            self.save_data()
+            self._index_alarm(alarm)
+        self._mark_dirty()
 
         return alarm
 
     def add_timeframe_alarm(self, ticker, percentage, direction, time_value, time_unit):
         """Add a timeframe percentage alarm"""
-        alarm_id = str(uuid.uuid4())
+        alarm_id = next_alarm_id()
 
         # Get current price as start price
         start_price = None
         if ticker in self.assets:
-            start_price = self.assets[ticker]['price']
+            start_price = self.assets[ticker].price
 
         alarm = {
             'id': alarm_id,
@@ -232,156 +386,272 @@ class CryptoMonitorBinance:
             'direction': direction,
             'timeValue': int(time_value) if time_unit != 'since_start' else None,
             'timeUnit': time_unit,
+            '_timeframeSeconds': timeframe_seconds(time_value, time_unit),
             'triggered': False,
             'createdAt': time.time(),
             'lastResetTime': time.time(),
             'startPrice': start_price  # Add start price for frontend calculation
         }
 
-        with self.lock:
+        with self._alarms_lock:
             self.alarms[alarm_id] = alarm
-            self.save_data()
+            self._index_alarm(alarm)
+        self._mark_dirty()
 
         return alarm
 
     def remove_alarm(self, alarm_id):
         """Remove an alarm"""
-        with self.lock:
+        with self._alarms_lock:
             if alarm_id in self.alarms:
-                del self.alarms[alarm_id]
-                self.save_data()
+                self._unindex_alarm(self.alarms.pop(alarm_id))
+                self._mark_dirty()
+
+    def _index_alarm(self, alarm):
+        """Register an alarm under its ticker so checks run per ticker"""
+        self.alarms_by_ticker.setdefault(alarm['ticker'], []).append(alarm['id'])
+
+        if not alarm.get('triggered') or alarm.get('resetting'):
+            self.active_alarm_ids.add(alarm['id'])
+
+        if alarm['type'] == 'target':
+            targets = self.targets_by_ticker.setdefault(alarm['ticker'], {'prices': [], 'ids': []})
+            idx = bisect.bisect_right(targets['prices'], float(alarm['targetPrice']))
+            targets['prices'].insert(idx, float(alarm['targetPrice']))
+            targets['ids'].insert(idx, alarm['id'])
+
+    def _unindex_alarm(self, alarm):
+        """Drop an alarm from the per-ticker indexes"""
+        self.active_alarm_ids.discard(alarm['id'])
+
+        alarm_ids = self.alarms_by_ticker.get(alarm['ticker'])
+        if alarm_ids and alarm['id'] in alarm_ids:
+            alarm_ids.remove(alarm['id'])
+
+        targets = self.targets_by_ticker.get(alarm['ticker'])
+        if targets and alarm['id'] in targets['ids']:
+            idx = targets['ids'].index(alarm['id'])
+            del targets['prices'][idx]
+            del targets['ids'][idx]
+
+    def _previous_price(self, ticker):
+        """Price the last move started from: the one seen by the previous alarm check,
+        or the second newest history sample before the ticker has been checked"""
+        if ticker in self._checked_prices:
+            return self._checked_prices[ticker]
+        history = self.price_history.get(ticker)
+        if history and len(history['px']) >= 2:
+            return history['px'][-2]
+        return None
+
+    def _crossed_target_ids(self, ticker, asset, previous_price):
+        """Ids of target alarms whose price lies between the previous and current price.
+
+        Returns None while the ticker is too new for crossing detection, in
+        which case every target alarm still needs the full check.
+        """
+        history = self.price_history.get(ticker)
+        if not history or len(history['px']) < 3 or previous_price is None:
+            return None
+
+        targets = self.targets_by_ticker.get(ticker)
+        if not targets:
+            return set()
+
+        lo, hi = sorted((previous_price, asset.price))
+        left = bisect.bisect_left(targets['prices'], lo)
+        right = bisect.bisect_right(targets['prices'], hi)
+        return set(targets['ids'][left:right])
 
     def restart_alarm(self, alarm_id):
         """Restart a target alarm after 60 seconds"""
-        with self.lock:
+        with self._alarms_lock:
             if alarm_id in self.alarms:
                 alarm = self.alarms[alarm_id]
                 alarm['resetUntil'] = time.time() + 60
                 alarm['resetting'] = True
-                self.save_data()
+                self.active_alarm_ids.add(alarm_id)
+                self._changed_alarm_ids.add(alarm_id)
+                self._mark_dirty()
 
                 def reset_after_cooldown():
                     time.sleep(60)
-                    with self.lock:
+                    with self._alarms_lock:
                         if alarm_id in self.alarms:
                             self.alarms[alarm_id]['triggered'] = False
                             self.alarms[alarm_id]['resetting'] = False
                             self.alarms[alarm_id]['resetUntil'] = None
-                            self.save_data()
+                            self._changed_alarm_ids.add(alarm_id)
+                            self._mark_dirty()
 
                 Thread(target=reset_after_cooldown, daemon=True).start()
 
     def update_all_prices(self):
         """Update prices for all assets"""
-        for ticker, asset in list(self.assets.items()):
-            try:
+        tickers = list(self.assets.keys())
+        if not tickers:
+            return
+
+        prices = self.fetch_binance_prices_bulk(tickers)
+        if prices is None:
+            # Binance rejects the whole batch if a single symbol is invalid,
+            # so fall back to per-symbol requests for this tick
+            prices = {}
+            for ticker in tickers:
                 price_data = self.fetch_binance_price(ticker)
-
                 if price_data:
-                    with self.lock:
-                        asset['price'] = price_data['price']
-                        asset['change24h'] = price_data['change24h']
-                        asset['lastUpdate'] = time.time()
-
-                        # Update max/min
-                        if price_data['price'] > asset['maxPrice']:
-                            asset['maxPrice'] = price_data['price']
-                        if price_data['price'] < asset['minPrice']:
-                            asset['minPrice'] = price_data['price']
-
-                        # Update price history
-                        if ticker not in self.price_history:
-                            self.price_history[ticker] = []
-
-                        self.price_history[ticker].append({
-                            'price': price_data['price'],
-                            'timestamp': time.time()
-                        })
-
-                        # Keep only last 24 hours
-                        cutoff = time.time() - (24 * 60 * 60)
-                        self.price_history[ticker] = [
-                            h for h in self.price_history[ticker] if h['timestamp'] > cutoff
-                        ]
-
-                        self.assets[ticker] = asset
+                    prices[ticker] = price_data
 
+        now = time.time()
+        for ticker, price_data in prices.items():
+            try:
+                self._apply_price(ticker, price_data, now)
             except Exception as e:
                 print(f"Error updating price for {ticker}: {e}")
 
-        self.save_data()
-
-    def check_alarms(self):
-        """Check all alarms for trigger conditions"""
+        self._mark_dirty()
+
+    def _apply_price(self, ticker, price_data, now, sample_seconds=0):
+        """Store a new price for an asset and record it in the price history.
+
+        A price arriving less than sample_seconds after the newest history
+        sample replaces that sample instead of adding one.
+        Returns True if a sample was added.
+        """
+        with self._assets_lock:
+            asset = self.assets.get(ticker)
+            if asset is None:
+                return False
+
+            asset.price = price_data['price']
+            asset.change24h = price_data['change24h']
+            asset.lastUpdate = now
+
+            # Update max/min
+            if price_data['price'] > asset.maxPrice:
+                asset.maxPrice = price_data['price']
+            if price_data['price'] < asset.minPrice:
+                asset.minPrice = price_data['price']
+
+        # Update price history, keeping only the last 24 hours
+        with self._history_lock:
+            if ticker not in self.price_history:
+                self.price_history[ticker] = _new_history()
+
+            history = self.price_history[ticker]
+            if len(history['ts']) > 1 and now - history['ts'][-1] < sample_seconds:
+                history['px'][-1] = price_data['price']
+                return False
+
+            history['ts'].append(now)
+            history['px'].append(price_data['price'])
+
+            # Nothing to prune while the oldest sample is still inside the window
+            cutoff = now - (24 * 60 * 60)
+            if history['ts'][0] <= cutoff:
+                idx = bisect.bisect_right(history['ts'], cutoff)
+                del history['ts'][:idx]
+                del history['px'][:idx]
+
+        return True
+
+    def check_alarms(self, tickers=None):
+        """Check alarms for trigger conditions (on all tickers, or only the given ones)"""
         triggered_alarms = []
-
-        for alarm_id, alarm in list(self.alarms.items()):
-            if alarm.get('triggered') and not alarm.get('resetting'):
+        now = time.time()
+        # Timeframe window start indices, shared by alarms watching the same window
+        window_cache = {}
+
+        if tickers is None:
+            tickers = list(self.alarms_by_ticker.keys())
+
+        # Alarms are grouped by ticker so each asset is looked up once per tick
+        for ticker in tickers:
+            alarm_ids = self.alarms_by_ticker.get(ticker)
+            asset = self.assets.get(ticker)
+            if asset is None:
                 continue
 
-            ticker = alarm['ticker']
-            if ticker not in self.assets:
+            previous_price = self._previous_price(ticker)
+            self._checked_prices[ticker] = asset.price
+            if not alarm_ids:
                 continue
 
-            asset = self.assets[ticker]
-            should_trigger = False
-            message = ''
-            direction = None
+            # A target alarm can only fire if the last move crossed its price
+            crossed_ids = self._crossed_target_ids(ticker, asset, previous_price)
 
-            try:
-                if alarm['type'] == 'target':
-                    should_trigger, direction = self.check_target_alarm(alarm, asset)
-                    if should_trigger:
-                        message = f"{asset['name']} ({ticker}) reached target price of ${alarm['targetPrice']:.2f}!"
+            # Only active alarms are checked; triggered ones wait for a reset
+            for alarm_id in [aid for aid in alarm_ids if aid in self.active_alarm_ids]:
+                alarm = self.alarms.get(alarm_id)
+                if alarm is None:
+                    continue
 
-                elif alarm['type'] == 'extreme':
-                    should_trigger, direction = self.check_extreme_alarm(alarm, asset)
-                    if should_trigger:
-                        message = f"{asset['name']} ({ticker}) hit extreme price level!"
+                if alarm['type'] == 'target' and crossed_ids is not None and alarm_id not in crossed_ids:
+                    continue
+
+                should_trigger = False
+                message = ''
+                direction = None
+
+                try:
+                    if alarm['type'] == 'target':
+                        should_trigger, direction = self.check_target_alarm(alarm, asset, previous_price)
+                        if should_trigger:
+                            message = f"{asset.name} ({ticker}) reached target price of ${alarm['targetPrice']:.2f}!"
+
+                    elif alarm['type'] == 'extreme':
+                        should_trigger, direction = self.check_extreme_alarm(alarm, asset)
+                        if should_trigger:
+                            message = f"{asset.name} ({ticker}) hit extreme price level!"
+
+                    elif alarm['type'] == 'timeframe':
+                        should_trigger, direction = self.check_timeframe_alarm(alarm, asset, now, window_cache)
+                        if should_trigger:
+                            message = f"{asset.name} ({ticker}) hit timeframe target!"
 
-                elif alarm['type'] == 'timeframe':
-                    should_trigger, direction = self.check_timeframe_alarm(alarm, asset)
                     if should_trigger:
-                        message = f"{asset['name']} ({ticker}) hit timeframe target!"
-
-                if should_trigger:
-                    if alarm['type'] == 'timeframe' and alarm['timeUnit'] == 'since_start':
-                        with self.lock:
-                            self.alarms[alarm_id]['lastResetTime'] = time.time()
-                            self.alarms[alarm_id]['startPrice'] = asset['price']  # Reset start price
-                            self.save_data()
-                    else:
-                        with self.lock:
-                            self.alarms[alarm_id]['triggered'] = True
-                            self.alarms[alarm_id]['triggeredAt'] = time.time()
-                            self.save_data()
-
-                    triggered_alarms.append({
-                        'alarm': alarm,
-                        'asset': asset,
-                        'message': message,
-                        'direction': direction
-                    })
+                        if alarm['type'] == 'timeframe' and alarm['timeUnit'] == 'since_start':
+                            with self._alarms_lock:
+                                alarm['lastResetTime'] = time.time()
+                                alarm['startPrice'] = asset.price  # Reset start price
+                                self._changed_alarm_ids.add(alarm_id)
+                                self._mark_dirty()
+                        else:
+                            with self._alarms_lock:
+                                alarm['triggered'] = True
+                                alarm['triggeredAt'] = time.time()
+                                if not alarm.get('resetting'):
+                                    self.active_alarm_ids.discard(alarm_id)
+                                self._changed_alarm_ids.add(alarm_id)
+                                self._mark_dirty()
+
+                        triggered_alarms.append({
+                            'alarm': alarm,
+                            'asset': asset.to_dict(),
+                            'message': message,
+                            'direction': direction
+                        })
 
-            except Exception as e:
-                print(f"Error checking alarm {alarm_id}: {e}")
+                except Exception as e:
+                    print(f"Error checking alarm {alarm_id}: {e}")
 
         return triggered_alarms
 
-    def check_target_alarm(self, alarm, asset):
+    def check_target_alarm(self, alarm, asset, previous_price=None):
         """Check if target price alarm should trigger"""
-        current_price = asset['price']
+        current_price = asset.price
         target_price = float(alarm['targetPrice'])  # Ensure float
 
         ticker = alarm['ticker']
-        history = self.price_history.get(ticker, [])
+        history = self.price_history.get(ticker)
+        prices = history['px'] if history else ()
 
         # Check if this is the first time checking this alarm
         alarm_age = time.time() - alarm['createdAt']
         is_first_check = alarm_age < 15  # Within first 15 seconds
 
         # For new alarms, check if current price already meets condition
-        if is_first_check and len(history) < 3:
+        if is_first_check and len(prices) < 3:
             print(f"  🔔 New alarm first check: {ticker} current=${current_price:.2f}, target=${target_price:.2f}, direction={alarm['direction']}")
             if alarm['direction'] == 'up':
                 if current_price >= target_price:
@@ -397,11 +667,12 @@ class CryptoMonitorBinance:
                     return True, 'up' if current_price >= target_price else 'down'
             return False, None
 
-        # Need at least 2 price points for crossing detection
-        if len(history) < 2:
-            return False, None
+        if previous_price is None:
+            previous_price = self._previous_price(ticker)
 
-        previous_price = history[-2]['price']
+        # Need a previous price for crossing detection
+        if previous_price is None:
+            return False, None
 
         # Check for crossing
         if alarm['direction'] == 'up':
@@ -427,57 +698,57 @@ class CryptoMonitorBinance:
 
     def check_extreme_alarm(self, alarm, asset):
         """Check if extreme (max/min) alarm should trigger"""
-        current_price = asset['price']
+        current_price = asset.price
 
         if alarm['extremeType'] == 'max':
-            max_price = asset['maxPrice']
+            max_price = asset.maxPrice
             percent_down = ((max_price - current_price) / max_price) * 100
             if percent_down >= alarm['percentage']:
                 return True, 'down'
         else:
-            min_price = asset['minPrice']
+            min_price = asset.minPrice
             percent_up = ((current_price - min_price) / min_price) * 100
             if percent_up >= alarm['percentage']:
                 return True, 'up'
 
         return False, None
 
-    def check_timeframe_alarm(self, alarm, asset):
+    def check_timeframe_alarm(self, alarm, asset, now=None, window_cache=None):
         """Check if timeframe alarm should trigger"""
         ticker = alarm['ticker']
-        history = self.price_history.get(ticker, [])
+        history = self.price_history.get(ticker)
 
-        if len(history) < 2:
+        if not history or len(history['ts']) < 2:
             return False, None
 
-        current_time = time.time()
+        current_time = now if now is not None else time.time()
 
-        if alarm['timeUnit'] == 'since_start':
+        timeframe_seconds = alarm.get('_timeframeSeconds')
+        if timeframe_seconds is None:
             start_time = alarm.get('lastResetTime', alarm['createdAt'])
         else:
-            time_value = alarm['timeValue']
-            if alarm['timeUnit'] == 'minutes':
-                timeframe_seconds = time_value * 60
-            elif alarm['timeUnit'] == 'hours':
-                timeframe_seconds = time_value * 60 * 60
-            elif alarm['timeUnit'] == 'days':
-                timeframe_seconds = time_value * 24 * 60 * 60
-            else:
-                timeframe_seconds = time_value * 60
-
             start_time = current_time - timeframe_seconds
 
-        relevant_history = [h for h in history if h['timestamp'] >= start_time]
+        # History is sorted by timestamp, so the window start is a binary search
+        key = (ticker, start_time)
+        if window_cache is not None and key in window_cache:
+            idx = window_cache[key]
+        else:
+            idx = bisect.bisect_left(history['ts'], start_time)
+            if window_cache is not None:
+                window_cache[key] = idx
 
-        if not relevant_history:
+        if idx >= len(history['ts']):
             return False, None
 
-        start_price = relevant_history[0]['price']
+        start_price = history['px'][idx]
 
         # Update the alarm's startPrice for frontend display
-        alarm['startPrice'] = start_price
+        if alarm.get('startPrice') != start_price:
+            alarm['startPrice'] = start_price
+            self._changed_alarm_ids.add(alarm['id'])
 
-        current_price = asset['price']
+        current_price = asset.price
         percent_change = ((current_price - start_price) / start_price) * 100
 
         if alarm['direction'] == 'up':
@@ -497,53 +768,154 @@ class CryptoMonitorBinance:
         print("📊 Monitoring started (Binance API)")
         while self.monitoring:
             try:
-                self.update_all_prices()
-                triggered = self.check_alarms()
-
+                if self._stream_connected:
+                    # Prices came in over the stream and their alarms were checked on arrival
+                    triggered = []
+                    while self._pending_triggered:
+                        triggered.append(self._pending_triggered.popleft())
+                else:
+                    self.update_all_prices()
+                    triggered = self.check_alarms()
+
+                # Prices and triggered alarms go out together as one message per tick
                 if self.price_update_callback:
                     self.price_update_callback({
-                        'assets': self.get_assets(),
-                        'alarms': self.get_alarms()
+                        'delta': self.get_price_delta(),
+                        'alarms_changed': self.get_changed_alarms(),
+                        'triggered': triggered
                     })
 
-                if triggered and self.alarm_callback:
-                    for alarm_data in triggered:
-                        self.alarm_callback(alarm_data)
-
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")
 
-            time.sleep(10)  # Update every 10 seconds
+            # Streamed prices are forwarded every second, polled ones every 10 seconds
+            time.sleep(1 if self._stream_connected else 10)
 
         print("Monitoring stopped")
 
+    def stream_loop(self):
+        """Keep the Binance ticker stream open, reconnecting when it drops"""
+        while self.monitoring:
+            self.stream = websocket.WebSocketApp(
+                BINANCE_STREAM_URL,
+                on_open=self._on_stream_open,
+                on_message=self._on_stream_message,
+                on_error=self._on_stream_error,
+                on_close=self._on_stream_close
+            )
+            self.stream.run_forever(ping_interval=60, ping_timeout=10)
+            self._stream_connected = False
+
+            if self.monitoring:
+                time.sleep(5)
+
+    def _stream_send(self, method, tickers):
+        """Send a SUBSCRIBE/UNSUBSCRIBE request for the tickers' 24h ticker streams"""
+        if not self._stream_connected or not tickers:
+            return
+        try:
+            self.stream.send(json.dumps({
+                'method': method,
+                'params': [f"{ticker.lower()}@ticker" for ticker in tickers],
+                'id': next(self._stream_request_ids)
+            }))
+        except Exception as e:
+            print(f"Error sending {method} to Binance stream: {e}")
+
+    def _on_stream_open(self, ws):
+        print("📡 Connected to Binance ticker stream")
+        self._stream_connected = True
+        self._stream_send('SUBSCRIBE', list(self.assets.keys()))
+
+    def _on_stream_message(self, ws, message):
+        try:
+            data = loads(message)
+            if data.get('e') != '24hrTicker':
+                return  # Replies to SUBSCRIBE/UNSUBSCRIBE
+
+            ticker = data['s']
+            price_data = {
+                'price': float(data['c']),
+                'change24h': float(data['P']),
+                'high24h': float(data['h']),
+                'low24h': float(data['l']),
+                'volume': float(data['v'])
+            }
+
+            if self._apply_price(ticker, price_data, time.time(), STREAM_SAMPLE_SECONDS):
+                self._mark_dirty()
+
+            self._pending_triggered.extend(self.check_alarms([ticker]))
+
+        except Exception as e:
+            print(f"Error handling Binance stream message: {e}")
+
+    def _on_stream_error(self, ws, error):
+        print(f"Binance stream error: {error}")
+
+    def _on_stream_close(self, ws, status_code, message):
+        if self._stream_connected:
+            print("Binance ticker stream closed, polling over REST")
+        self._stream_connected = False
+
     def start_monitoring(self):
         """Start the monitoring thread"""
         if not self.monitoring:
             self.monitoring = True
             self.monitor_thread = Thread(target=self.monitoring_loop, daemon=True)
             self.monitor_thread.start()
+            self.save_thread = Thread(target=self._save_loop, daemon=True)
+            self.save_thread.start()
+            if websocket is not None:
+                self.stream_thread = Thread(target=self.stream_loop, daemon=True)
+                self.stream_thread.start()
 
     def stop_monitoring(self):
         """Stop the monitoring thread"""
         self.monitoring = False
+        if self.stream:
+            self.stream.close()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        if self.save_thread:
+            self.save_thread.join(timeout=5)
+        if self._dirty:
+            self.save_data()
 
     def set_price_update_callback(self, callback):
-        """Set callback for price updates"""
+        """Set callback for per-tick updates (prices, alarms and triggered alarms)"""
         self.price_update_callback = callback
 
-    def set_alarm_callback(self, callback):
-        """Set callback for alarm triggers"""
-        self.alarm_callback = callback
-
     def get_assets(self):
         """Get all assets"""
-        with self.lock:
-            return dict(self.assets)
+        with self._assets_lock:
+            return {ticker: asset.to_dict() for ticker, asset in self.assets.items()}
+
+    def get_price_delta(self):
+        """Compact prices of the assets that changed since the last call.
+
+        Returns {ticker: [price, change24h, maxPrice, minPrice]}; clients get the
+        full assets on connect/asset_added, so static fields are not resent.
+        """
+        delta = {}
+        sent_prices = {}
+        with self._assets_lock:
+            for ticker, asset in self.assets.items():
+                sent_prices[ticker] = asset.price
+                if self._last_sent_prices.get(ticker) != asset.price:
+                    delta[ticker] = [asset.price, asset.change24h, asset.maxPrice, asset.minPrice]
+
+        self._last_sent_prices = sent_prices
+        return delta
 
     def get_alarms(self):
         """Get all alarms"""
-        with self.lock:
+        with self._alarms_lock:
             return dict(self.alarms)
+
+    def get_changed_alarms(self):
+        """Alarms the monitor changed (triggered, reset, new start price) since the last call"""
+        with self._alarms_lock:
+            changed = [self.alarms[aid] for aid in self._changed_alarm_ids if aid in self.alarms]
+            self._changed_alarm_ids.clear()
+        return changed
@@ -0,0 +1,56 @@
+"""
+Helpers shared by the CoinGecko and Binance monitors
+"""
+
+import itertools
+import json
+import os
+import time
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+# Alarm ids only need to be unique within this app's data file. Seeding the
+# counter with the start time in ms keeps ids from earlier runs from colliding.
+_alarm_counter = itertools.count(int(time.time() * 1000))
+
+
+def next_alarm_id():
+    """Short, process-unique alarm id"""
+    return f'a{next(_alarm_counter):x}'
+
+
+TIME_UNIT_SECONDS = {'minutes': 60, 'hours': 60 * 60, 'days': 24 * 60 * 60}
+
+
+def timeframe_seconds(time_value, time_unit):
+    """Window length of a timeframe alarm in seconds (None for 'since_start')"""
+    if time_unit == 'since_start':
+        return None
+    return int(time_value) * TIME_UNIT_SECONDS.get(time_unit, 60)
+
+
+def dumps(data):
+    """Serialize to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def loads(raw):
+    """Parse JSON bytes"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def write_atomic(path, payload):
+    """Write bytes to a temp file and swap it in, so a crash never leaves a half-written file"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
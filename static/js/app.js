@@ -60,6 +60,16 @@ class CryptoAlarmClient {
 
         this.socket.on('asset_removed', (data) => {
             delete this.assets[data.ticker];
+            // The server drops the asset's alarms along with it
+            Object.keys(this.alarms).forEach(alarmId => {
+                if (this.alarms[alarmId].ticker === data.ticker) {
+                    delete this.alarms[alarmId];
+                }
+            });
+            if (this.currentView === 'alarms') {
+                this.renderAlarms();
+            }
+            this.renderAllActiveAlarms();
             this.renderAssets();
         });
 
@@ -90,16 +100,22 @@ class CryptoAlarmClient {
         });
 
         this.socket.on('price_update', (data) => {
-            this.assets = data.assets;
-            this.alarms = data.alarms;
-            this.renderAssets();
-            if (this.currentView === 'alarms') {
-                this.renderAlarms();
-            }
-            const allAlarmsTab = document.querySelector('.tab-button[data-tab="all-alarms"]');
-            if (allAlarmsTab && allAlarmsTab.classList.contains('active')) {
-                this.renderAllActiveAlarms();
-            }
+            this.applyPriceUpdate(data);
+        });
+
+        // Changed prices of all assets, one frame per tick
+        this.socket.on('price', (delta) => {
+            this.applyPriceDelta(delta);
+        });
+
+        // Sent once at the end of every monitoring tick, after that tick's prices.
+        // Only alarms that changed during the tick are included.
+        this.socket.on('tick', (data) => {
+            (data.alarms_changed || []).forEach(alarm => {
+                this.alarms[alarm.id] = alarm;
+            });
+            this.renderPriceViews();
+            (data.triggered || []).forEach(alarmData => this.triggerAlarm(alarmData));
         });
 
         this.socket.on('alarm_triggered', (data) => {
@@ -111,6 +127,37 @@ class CryptoAlarmClient {
         });
     }
 
+    // Only assets whose price changed and alarms the server changed are sent
+    applyPriceUpdate(data) {
+        Object.assign(this.assets, data.delta);
+        (data.alarms_changed || []).forEach(alarm => {
+            this.alarms[alarm.id] = alarm;
+        });
+        this.renderPriceViews();
+    }
+
+    // Price deltas only carry changed values: {ticker: [price, change24h, maxPrice, minPrice]}
+    // Rendering waits for the 'tick' that follows them.
+    applyPriceDelta(delta) {
+        Object.entries(delta).forEach(([ticker, [price, change24h, maxPrice, minPrice]]) => {
+            const asset = this.assets[ticker];
+            if (asset) {
+                Object.assign(asset, { price, change24h, maxPrice, minPrice });
+            }
+        });
+    }
+
+    renderPriceViews() {
+        this.renderAssets();
+        if (this.currentView === 'alarms') {
+            this.renderAlarms();
+        }
+        const allAlarmsTab = document.querySelector('.tab-button[data-tab="all-alarms"]');
+        if (allAlarmsTab && allAlarmsTab.classList.contains('active')) {
+            this.renderAllActiveAlarms();
+        }
+    }
+
     setupAudioContext() {
         document.addEventListener('click', () => {
             if (!this.audioContext) {